@@ -0,0 +1,46 @@
+import functools
+
+import orjson
+from urllib3.util import retry
+
+from jira_confluence_mcp import common
+
+
+@functools.cache
+def get_chat_completions_url() -> str:
+    return (
+        f"/openai/deployments/{common.getenv("AZURE_OPENAI_CHAT_DEPLOYMENT_NAME")}"
+        f"/chat/completions?api-version={common.getenv("AZURE_OPENAI_API_VERSION")}"
+    )
+
+
+@functools.cache
+def get_session() -> common.Session:
+    return common.create_session(
+        {"api-key": common.getenv("AZURE_OPENAI_API_KEY")},
+        common.getenv("AZURE_OPENAI_ENDPOINT").rstrip("/"),
+        retry.Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+        timeout=(3.05, 300.0),
+        retry_reads=False,
+    )
+
+
+def describe_image(image_b64: bytes, media_type: str, prompt: str) -> str:
+    payload = b"".join(
+        (
+            b'{"messages": [{"content": [{"image_url": {"url": "',
+            f"data:{media_type};base64,".encode("utf-8"),
+            image_b64,
+            b'"}, "type": "image_url"}, {"text": ',
+            orjson.dumps(prompt),
+            b', "type": "text"}], "role": "user"}]}',
+        )
+    )
+    response = get_session().post(
+        get_chat_completions_url(),
+        data=payload,
+        headers={"Content-Type": "application/json"},
+    )
+    response.raise_for_status()
+    response_json = orjson.loads(response.content)
+    return response_json["choices"][0]["message"]["content"]
@@ -0,0 +1,96 @@
+import atexit
+import base64
+import functools
+import mimetypes
+import os
+import socket
+
+import requests
+from requests import adapters
+from urllib3 import connection
+from urllib3.util import retry
+
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+CHUNK_SIZE = 3 * 2**16
+
+
+def getenv(name: str) -> str:
+    value = os.environ.get(name)
+    if not value:
+        raise RuntimeError(f"The {name} environment variable is required.")
+    return value
+
+
+class HTTPAdapter(adapters.HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = [
+            *connection.HTTPConnection.default_socket_options,
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+class Session(requests.Session):
+    def __init__(
+        self,
+        base_url: str = "",
+        timeout: float | tuple[float, float | None] = (3.05, 30.0),
+    ):
+        super().__init__()
+        self.base_url = base_url
+        self.timeout = timeout
+
+    def request(self, method, url, *args, **kwargs):
+        if url.startswith("/"):
+            url = f"{self.base_url}{url}"
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, *args, **kwargs)
+
+    def download_base64(self, url: str) -> bytearray:
+        with self.get(url, headers={"Accept": "*/*"}, stream=True) as response:
+            response.raise_for_status()
+            content_b64 = bytearray()
+            remainder = b""
+            for chunk in response.iter_content(CHUNK_SIZE):
+                chunk = remainder + chunk
+                end = len(chunk) - len(chunk) % 3
+                content_b64 += base64.b64encode(chunk[:end])
+                remainder = chunk[end:]
+            content_b64 += base64.b64encode(remainder)
+            return content_b64
+
+
+def create_session(
+    headers: dict[str, str],
+    base_url: str = "",
+    allowed_methods: frozenset[str] = retry.Retry.DEFAULT_ALLOWED_METHODS,
+    timeout: float | tuple[float, float | None] = (3.05, 30.0),
+    retry_reads: bool = True,
+) -> Session:
+    session = Session(base_url, timeout)
+    session.headers.update(headers)
+    max_retries = retry.Retry(
+        total=5,
+        read=None if retry_reads else 0,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=allowed_methods,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=POOL_MAXSIZE,
+        max_retries=max_retries,
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    atexit.register(session.close)
+    return session
+
+
+@functools.lru_cache(maxsize=256)
+def guess_media_type(filename: str) -> str:
+    media_type, _ = mimetypes.guess_type(filename)
+    return media_type or "application/octet-stream"
@@ -1,25 +1,55 @@
-import base64
-import collections
-import mimetypes
-import os
+import functools
 import re
+from concurrent import futures
 from typing import Any
 from urllib import parse
 
-import requests
+from jira_confluence_mcp import azure_openai, common
+
+GLIFFY_PATTERN = re.compile(
+    r'<ac:structured-macro[^>]+ac:name="gliffy"[^>]+>'
+    r'.*?<ac:parameter ac:name="name">(.*?)</ac:parameter>.*?'
+    r"</ac:structured-macro>",
+    re.DOTALL,
+)
+CODE_MACRO_PREFIX = (
+    '<ac:structured-macro ac:name="code">'
+    '<ac:parameter ac:name="language">json</ac:parameter>'
+    "<ac:plain-text-body><![CDATA["
+)
+CODE_MACRO_SUFFIX = "]]></ac:plain-text-body></ac:structured-macro>"
+
+EXECUTOR = futures.ThreadPoolExecutor(max_workers=common.POOL_MAXSIZE)
+
+
+@functools.cache
+def get_session() -> common.Session:
+    personal_access_token = common.getenv("CONFLUENCE_PERSONAL_ACCESS_TOKEN")
+    return common.create_session(
+        {"Authorization": f"Bearer {personal_access_token}"},
+        common.getenv("CONFLUENCE_BASE_URL").rstrip("/"),
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def resolve_page_id(space_key: str, title: str) -> str:
+    url = "/rest/api/content"
+    params = {"spaceKey": space_key, "title": title}
+    response = get_session().get(url, params=params)
+    response.raise_for_status()
+    response_json = response.json()
+    return response_json["results"][0]["id"]
+
+
+def clear_page_id_cache():
+    resolve_page_id.cache_clear()
 
 
 def add_tools(mcp):
     def get_space_key_confluence(page_id: str) -> str:
-        base_url = os.environ["CONFLUENCE_BASE_URL"]
-        url = f"{base_url}/rest/api/content/{page_id}"
+        url = f"/rest/api/content/{page_id}"
         params = {"expand": "space"}
-        personal_access_token = os.environ["CONFLUENCE_PERSONAL_ACCESS_TOKEN"]
-        headers = {
-            "Authorization": f"Bearer {personal_access_token}",
-            "Content-Type": "application/json",
-        }
-        response = requests.get(url, params, headers=headers)
+        response = get_session().get(url, params=params)
         response.raise_for_status()
         response_json = response.json()
         return response_json["space"]["key"]
@@ -53,8 +83,7 @@ def add_tools(mcp):
                 type (str): The type of the content item (usually "page").
                 version (dict): Versioning details of the page, such as version number, updatedBy, updateDate, and minorEdit.
         """
-        base_url = os.environ["CONFLUENCE_BASE_URL"]
-        url = f"{base_url}/rest/api/content"
+        url = "/rest/api/content"
         space_key = get_space_key_confluence(parent_page_id)
         payload = {
             "ancestors": [{"id": parent_page_id}],
@@ -63,24 +92,13 @@ def add_tools(mcp):
             "title": title,
             "type": "page",
         }
-        personal_access_token = os.environ["CONFLUENCE_PERSONAL_ACCESS_TOKEN"]
-        headers = {
-            "Authorization": f"Bearer {personal_access_token}",
-            "Content-Type": "application/json",
-        }
-        response = requests.post(url, json=payload, headers=headers)
+        response = get_session().post(url, json=payload)
         response.raise_for_status()
         return response.json()
 
     def get_attachment_confluence(page_id: str, filename: str) -> bytes:
-        base_url = os.environ["CONFLUENCE_BASE_URL"]
-        url = f"{base_url}/download/attachments/{page_id}/{filename}"
-        personal_access_token = os.environ["CONFLUENCE_PERSONAL_ACCESS_TOKEN"]
-        headers = {
-            "Authorization": f"Bearer {personal_access_token}",
-            "Content-Type": "application/json",
-        }
-        response = requests.get(url, headers=headers)
+        url = f"/download/attachments/{page_id}/{filename}"
+        response = get_session().get(url)
         response.raise_for_status()
         return response.content
 
@@ -98,42 +116,13 @@ def add_tools(mcp):
         Returns:
             str: The answer returned after processing the prompt about the image. The response is generated by a LLM model based on the provided image and prompt, and contains a textual interpretation, description, or analysis of the image content, depending on the prompt. The result may include details such as detected objects, structure, layout, or other relevant information found in the image as interpreted by the model.
         """
-        openai_url = (
-            f"{os.environ["AZURE_OPENAI_ENDPOINT"]}"
-            f"/openai/deployments/{os.environ["AZURE_OPENAI_CHAT_DEPLOYMENT_NAME"]}"
-            f"/chat/completions?api-version={os.environ["AZURE_OPENAI_API_VERSION"]}"
-        )
-        media_type, _ = mimetypes.guess_type(filename)
+        media_type = common.guess_media_type(filename)
+        url = f"/download/attachments/{page_id}/{filename}"
         try:
-            attachment = get_attachment_confluence(page_id, filename)
+            attachment_b64 = get_session().download_base64(url)
         except Exception as e:
             return ""
-        attachment_b64 = base64.b64encode(attachment)
-        attachment_b64_utf8 = attachment_b64.decode("utf-8")
-        payload = {
-            "messages": [
-                {
-                    "content": [
-                        {
-                            "image_url": {
-                                "url": f"data:{media_type};base64,{attachment_b64_utf8}"
-                            },
-                            "type": "image_url",
-                        },
-                        {"text": prompt, "type": "text"},
-                    ],
-                    "role": "user",
-                }
-            ]
-        }
-        headers = {
-            "api-key": os.environ["AZURE_OPENAI_API_KEY"],
-            "Content-Type": "application/json",
-        }
-        response = requests.post(openai_url, json=payload, headers=headers)
-        response.raise_for_status()
-        response_json = response.json()
-        return response_json["choices"][0]["message"]["content"]
+        return azure_openai.describe_image(attachment_b64, media_type, prompt)
 
     @mcp.tool()
     def get_page_id_confluence(space_key: str, title: str) -> str:
@@ -148,31 +137,14 @@ def add_tools(mcp):
         Returns:
             str: The ID of the retrieved page.
         """
-        base_url = os.environ["CONFLUENCE_BASE_URL"]
-        url = f"{base_url}/rest/api/content"
         space_key_unquoted = parse.unquote_plus(space_key)
         title_unquoted = parse.unquote_plus(title)
-        params = {"spaceKey": space_key_unquoted, "title": title_unquoted}
-        personal_access_token = os.environ["CONFLUENCE_PERSONAL_ACCESS_TOKEN"]
-        headers = {
-            "Authorization": f"Bearer {personal_access_token}",
-            "Content-Type": "application/json",
-        }
-        response = requests.get(url, params, headers=headers)
-        response.raise_for_status()
-        response_json = response.json()
-        return response_json["results"][0]["id"]
+        return resolve_page_id(space_key_unquoted, title_unquoted)
 
     def get_child_pages_confluence(page_id: str) -> list[dict[str, str]]:
-        base_url = os.environ["CONFLUENCE_BASE_URL"]
-        url = f"{base_url}/rest/api/content/{page_id}/child"
+        url = f"/rest/api/content/{page_id}/child"
         params = {"expand": "page.body.VIEW"}
-        personal_access_token = os.environ["CONFLUENCE_PERSONAL_ACCESS_TOKEN"]
-        headers = {
-            "Authorization": f"Bearer {personal_access_token}",
-            "Content-Type": "application/json",
-        }
-        response = requests.get(url, params, headers=headers)
+        response = get_session().get(url, params=params)
         response.raise_for_status()
         response_json = response.json()
         return [
@@ -196,27 +168,24 @@ def add_tools(mcp):
                 id (str): The page ID of the current node.
                 title (str): The title of the current node.
         """
-        queue = collections.deque()
         page_tree = {"id": page_id, "title": title, "children": []}
-        queue.append(page_tree)
-        while queue:
-            current_page = queue.popleft()
-            child_pages = get_child_pages_confluence(current_page["id"])
-            for child_page in child_pages:
-                current_page["children"].append(child_page)
-                queue.append(child_page)
+        pending = {EXECUTOR.submit(get_child_pages_confluence, page_id): page_tree}
+        while pending:
+            done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+            for future in done:
+                current_page = pending.pop(future)
+                current_page["children"] = future.result()
+                for child_page in current_page["children"]:
+                    child_future = EXECUTOR.submit(
+                        get_child_pages_confluence, child_page["id"]
+                    )
+                    pending[child_future] = child_page
         return page_tree
 
     def get_page_confluence(page_id: str) -> dict[str, Any]:
-        base_url = os.environ["CONFLUENCE_BASE_URL"]
-        url = f"{base_url}/rest/api/content/{page_id}"
+        url = f"/rest/api/content/{page_id}"
         params = {"expand": "body.storage,version"}
-        personal_access_token = os.environ["CONFLUENCE_PERSONAL_ACCESS_TOKEN"]
-        headers = {
-            "Authorization": f"Bearer {personal_access_token}",
-            "Content-Type": "application/json",
-        }
-        response = requests.get(url, params, headers=headers)
+        response = get_session().get(url, params=params)
         response.raise_for_status()
         return response.json()
 
@@ -241,30 +210,29 @@ def add_tools(mcp):
                 title (str): The title of the retrieved page.
                 type (str): The type of the content item (usually "page").
         """
-        pattern = (
-            r'<ac:structured-macro[^>]+ac:name="gliffy"[^>]+>'
-            r'.*?<ac:parameter ac:name="name">(.*?)</ac:parameter>.*?'
-            r"</ac:structured-macro>"
-        )
 
-        def repl(match: re.Match[str]) -> str:
-            filename = match.group(1)
+        def get_gliffy_confluence(filename: str) -> str:
             try:
                 attachment = get_attachment_confluence(page_id, filename)
             except Exception as e:
                 return ""
             attachment_utf8 = attachment.decode("utf-8")
-            return (
-                '<ac:structured-macro ac:name="code">'
-                '<ac:parameter ac:name="language">json</ac:parameter>'
-                f"<ac:plain-text-body><![CDATA[{attachment_utf8}]]></ac:plain-text-body>"
-                "</ac:structured-macro>"
-            )
+            return "".join((CODE_MACRO_PREFIX, attachment_utf8, CODE_MACRO_SUFFIX))
+
+        def repl(match: re.Match[str]) -> str:
+            return code_macros[match.group(1)]
 
         page = get_page_confluence(page_id)
-        page["body"]["storage"]["value"] = re.sub(
-            pattern, repl, page["body"]["storage"]["value"], flags=re.DOTALL
+        body = page["body"]["storage"]["value"]
+        filenames = list(
+            dict.fromkeys(match.group(1) for match in GLIFFY_PATTERN.finditer(body))
+        )
+        if not filenames:
+            return page
+        code_macros = dict(
+            zip(filenames, EXECUTOR.map(get_gliffy_confluence, filenames))
         )
+        page["body"]["storage"]["value"] = GLIFFY_PATTERN.sub(repl, body)
         return page
 
     @mcp.tool()
@@ -297,20 +265,14 @@ def add_tools(mcp):
                 start (int): The start index of the result set.
                 totalSize (int): Total number of matching contents for the query.
         """
-        base_url = os.environ["CONFLUENCE_BASE_URL"]
-        url = f"{base_url}/rest/api/content/search"
+        url = "/rest/api/content/search"
         params = {
             "cql": cql,
             "expand": "page.body.VIEW",
             "limit": limit,
             "start": start,
         }
-        personal_access_token = os.environ["CONFLUENCE_PERSONAL_ACCESS_TOKEN"]
-        headers = {
-            "Authorization": f"Bearer {personal_access_token}",
-            "Content-Type": "application/json",
-        }
-        response = requests.get(url, params, headers=headers)
+        response = get_session().get(url, params=params)
         response.raise_for_status()
         return response.json()
 
@@ -341,19 +303,15 @@ def add_tools(mcp):
                 type (str): The type of the content item (usually "page").
                 version (dict): Versioning details of the page, such as by, when, number, minorEdit, hidden, _expandable, and _links.
         """
-        base_url = os.environ["CONFLUENCE_BASE_URL"]
-        url = f"{base_url}/rest/api/content/{page_id}"
-        personal_access_token = os.environ["CONFLUENCE_PERSONAL_ACCESS_TOKEN"]
-        headers = {
-            "Authorization": f"Bearer {personal_access_token}",
-            "Content-Type": "application/json",
-        }
+        url = f"/rest/api/content/{page_id}"
         payload = get_page_confluence(page_id)
         payload["version"]["number"] = payload["version"]["number"] + 1
         if body:
             payload["body"]["storage"]["value"] = body
         if title:
             payload["title"] = title
-        response = requests.put(url, headers=headers, json=payload)
+        response = get_session().put(url, json=payload)
         response.raise_for_status()
+        if title:
+            clear_page_id_cache()
         return response.json()
@@ -0,0 +1,398 @@
+import asyncio
+import collections
+import functools
+import os
+import threading
+import time
+from concurrent import futures
+from typing import Any, NamedTuple
+
+import orjson
+import requests
+from urllib3.util import retry
+
+from jira_confluence_mcp import azure_openai, common
+
+FIELDS = (
+    "assignee,attachment,comment,components,created,description,"
+    "issuetype,labels,reporter,status,summary,updated"
+)
+ISSUE_PARAMS = {"fields": FIELDS}
+SEARCH_FIELDS = FIELDS.split(",")
+SEARCH_BATCH_SIZE = 50
+SEARCH_CONCURRENCY = 32
+
+EXECUTOR = futures.ThreadPoolExecutor(max_workers=common.POOL_MAXSIZE)
+
+ISSUE_CACHE_MAXSIZE = 512
+
+
+def get_cache_ttl() -> float:
+    value = os.environ.get("JIRA_CACHE_TTL") or "300"
+    try:
+        return float(value)
+    except ValueError:
+        raise RuntimeError(
+            "The JIRA_CACHE_TTL environment variable must be a number of seconds."
+        ) from None
+
+
+ISSUE_CACHE_TTL = get_cache_ttl()
+
+
+def new_session(
+    allowed_methods: frozenset[str] = retry.Retry.DEFAULT_ALLOWED_METHODS,
+) -> common.Session:
+    personal_access_token = common.getenv("JIRA_PERSONAL_ACCESS_TOKEN")
+    headers = {
+        "Accept": "application/json",
+        "Authorization": f"Bearer {personal_access_token}",
+    }
+    base_url = common.getenv("JIRA_BASE_URL").rstrip("/")
+    return common.create_session(headers, base_url, allowed_methods)
+
+
+@functools.cache
+def get_session() -> common.Session:
+    return new_session()
+
+
+@functools.cache
+def get_search_session() -> common.Session:
+    return new_session(retry.Retry.DEFAULT_ALLOWED_METHODS | {"POST"})
+
+
+class CachedIssue(NamedTuple):
+    stored_at: float
+    etag: str | None
+    last_modified: str | None
+    issue: dict[str, Any]
+
+
+issue_cache: collections.OrderedDict[str, CachedIssue] = collections.OrderedDict()
+issue_ids: dict[str, str] = {}
+issue_aliases: dict[str, set[str]] = {}
+issue_cache_lock = threading.Lock()
+search_semaphore = asyncio.Semaphore(SEARCH_CONCURRENCY)
+
+
+def normalize_issue_key(issue_id_or_key: str) -> str:
+    return issue_id_or_key.strip().upper()
+
+
+def get_cached_issue(issue_id_or_key: str) -> CachedIssue | None:
+    key = normalize_issue_key(issue_id_or_key)
+    with issue_cache_lock:
+        issue_id = issue_ids.get(key)
+        if issue_id is None:
+            return None
+        issue_cache.move_to_end(issue_id)
+        return issue_cache[issue_id]
+
+
+def is_fresh(cached_issue: CachedIssue) -> bool:
+    return time.monotonic() - cached_issue.stored_at < ISSUE_CACHE_TTL
+
+
+def add_issue_alias(issue_id_or_key: str, issue_id: str):
+    key = normalize_issue_key(issue_id_or_key)
+    previous_issue_id = issue_ids.get(key)
+    if previous_issue_id == issue_id:
+        return
+    if previous_issue_id is not None:
+        issue_aliases[previous_issue_id].discard(key)
+    issue_ids[key] = issue_id
+    issue_aliases.setdefault(issue_id, set()).add(key)
+
+
+def drop_issue(issue_id: str):
+    issue_cache.pop(issue_id, None)
+    for key in issue_aliases.pop(issue_id, ()):
+        del issue_ids[key]
+
+
+def cache_issue(
+    issue_id_or_key: str,
+    issue: dict[str, Any],
+    etag: str | None = None,
+    last_modified: str | None = None,
+):
+    cached_issue = CachedIssue(time.monotonic(), etag, last_modified, issue)
+    with issue_cache_lock:
+        issue_cache[issue["id"]] = cached_issue
+        issue_cache.move_to_end(issue["id"])
+        for key in (issue_id_or_key, issue["id"], issue["key"]):
+            add_issue_alias(key, issue["id"])
+        while len(issue_cache) > ISSUE_CACHE_MAXSIZE:
+            drop_issue(next(iter(issue_cache)))
+
+
+def evict_issue(issue_id_or_key: str):
+    key = normalize_issue_key(issue_id_or_key)
+    with issue_cache_lock:
+        issue_id = issue_ids.get(key)
+        if issue_id is not None:
+            drop_issue(issue_id)
+
+
+def get_issue(issue_id_or_key: str) -> dict[str, Any]:
+    cached_issue = get_cached_issue(issue_id_or_key)
+    headers = {}
+    if cached_issue is not None:
+        if is_fresh(cached_issue):
+            return cached_issue.issue
+        if cached_issue.etag:
+            headers["If-None-Match"] = cached_issue.etag
+        if cached_issue.last_modified:
+            headers["If-Modified-Since"] = cached_issue.last_modified
+    url = f"/rest/api/2/issue/{issue_id_or_key}"
+    response = get_session().get(url, params=ISSUE_PARAMS, headers=headers)
+    if cached_issue is not None and response.status_code == 304:
+        issue = cached_issue.issue
+        etag = cached_issue.etag
+        last_modified = cached_issue.last_modified
+    else:
+        response.raise_for_status()
+        issue = orjson.loads(response.content)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+    cache_issue(issue_id_or_key, issue, etag, last_modified)
+    return issue
+
+
+def quote_issue_id_or_key(issue_id_or_key: str) -> str:
+    if issue_id_or_key.isdecimal():
+        return issue_id_or_key
+    return '"' + issue_id_or_key.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def search_issues(issue_id_or_keys: list[str]) -> list[dict[str, Any]]:
+    url = "/rest/api/2/search"
+    quoted_keys = ", ".join(map(quote_issue_id_or_key, issue_id_or_keys))
+    payload = {
+        "fields": SEARCH_FIELDS,
+        "jql": f"key in ({quoted_keys})",
+        "maxResults": len(issue_id_or_keys),
+        "validateQuery": False,
+    }
+    response = get_search_session().post(url, json=payload)
+    response.raise_for_status()
+    return orjson.loads(response.content)["issues"]
+
+
+async def search_issues_async(issue_id_or_keys: list[str]) -> list[dict[str, Any]]:
+    loop = asyncio.get_running_loop()
+    async with search_semaphore:
+        return await loop.run_in_executor(EXECUTOR, search_issues, issue_id_or_keys)
+
+
+async def get_issue_async(issue_id_or_key: str) -> dict[str, Any] | None:
+    loop = asyncio.get_running_loop()
+    async with search_semaphore:
+        try:
+            return await loop.run_in_executor(EXECUTOR, get_issue, issue_id_or_key)
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+
+
+async def get_issues(issue_id_or_keys: list[str]) -> list[dict[str, Any]]:
+    keys = list(dict.fromkeys(map(normalize_issue_key, issue_id_or_keys)))
+    issues = {}
+    missing_keys = []
+    for key in keys:
+        cached_issue = get_cached_issue(key)
+        if cached_issue is not None and is_fresh(cached_issue):
+            issues[key] = cached_issue.issue
+        else:
+            missing_keys.append(key)
+    batches = await asyncio.gather(
+        *(
+            search_issues_async(missing_keys[start : start + SEARCH_BATCH_SIZE])
+            for start in range(0, len(missing_keys), SEARCH_BATCH_SIZE)
+        )
+    )
+    for batch in batches:
+        for issue in batch:
+            cache_issue(issue["key"], issue)
+            issues[normalize_issue_key(issue["id"])] = issue
+            issues[normalize_issue_key(issue["key"])] = issue
+    # Moved or renamed keys match the search but come back under their new key.
+    unresolved_keys = [key for key in missing_keys if key not in issues]
+    fallback_issues = await asyncio.gather(*map(get_issue_async, unresolved_keys))
+    for key, issue in zip(unresolved_keys, fallback_issues):
+        if issue is not None:
+            issues[key] = issue
+    return [issues[key] for key in keys if key in issues]
+
+
+def add_tools(mcp):
+    @mcp.tool()
+    def create_issue_jira(
+        project: str, issue_type: str, summary: str, description: str
+    ) -> dict[str, Any]:
+        """
+        When to use:
+            Use this function to create a new Jira issue.
+
+        Args:
+            project (str): The key of the project where the issue will be created.
+            issue_type (str): The type of issue to create. Available types are Bug, Story, or Task.
+                Bug: A problem which impairs or prevents the functions of a product.
+                Story: The smallest unit of work that needs to be done.
+                Task: Represents work that needs to be done.
+            summary (str): A brief summary of the issue to create.
+            description (str): A detailed description of the issue to create.
+
+        Returns:
+            dict[str, Any]: Information about the created Jira issue as a dictionary, including:
+                id (str): The id of the created issue.
+                key (str): The key of the created issue.
+                self (str): The URL of the created issue.
+        """
+        url = "/rest/api/2/issue"
+        payload = {
+            "fields": {
+                "description": description,
+                "issuetype": {"name": issue_type},
+                "project": {"key": project},
+                "summary": summary,
+            }
+        }
+        response = get_session().post(url, json=payload)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    @mcp.tool()
+    def describe_image_jira(url: str, prompt: str) -> str:
+        """
+        When to use:
+            Use this function to ask a prompt about the contents of an image attachment in a Jira issue and retrieve the answer.
+
+        Args:
+            url (str): The URL of the attached file.
+            prompt (str): The prompt about the image.
+
+        Returns:
+            str: The answer returned after processing the prompt about the image.
+        """
+        media_type = common.guess_media_type(url)
+        try:
+            attachment_b64 = get_session().download_base64(url)
+        except Exception as e:
+            return ""
+        return azure_openai.describe_image(attachment_b64, media_type, prompt)
+
+    @mcp.tool()
+    async def get_issue_jira(issue_id_or_key: str) -> dict[str, Any]:
+        """
+        When to use:
+            Use this function to retrieve the contents of a Jira issue.
+
+        Args:
+            issue_id_or_key (str): The id or key of the Jira issue to retrieve.
+
+        Returns:
+            dict[str, Any]: Information about the retrieved Jira issue as a dictionary, including:
+                assignee (dict): The person to whom the issue is currently assigned.
+                attachment (list): Files attached to the issue.
+                comment (dict): Comments on the issue. Includes individual comments, authors, timestamps, and content.
+                components (list): Project components to which this issue relates.
+                created (str): The time and date when this issue was created.
+                description (str): A detailed description of the issue.
+                expand (str): Additional fields that can be requested.
+                fields (dict): Details of the issue, including all other keys in this section.
+                id (str): The id of the retrieved issue.
+                issuetype (dict): The type of the issue (e.g. Bug, Story, Task).
+                key (str): The key of the retrieved issue.
+                labels (list): Labels to which this issue relates.
+                reporter (dict): The person who created the issue.
+                self (str): The URL of the retrieved issue.
+                status (dict): The current status of the issue in its workflow.
+                summary (str): A brief one-line summary of the issue.
+                updated (str): The time and date when this issue was last updated.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(EXECUTOR, get_issue, issue_id_or_key)
+
+    @mcp.tool()
+    async def get_issues_jira(issue_id_or_keys: list[str]) -> list[dict[str, Any]]:
+        """
+        When to use:
+            Use this function to retrieve the contents of several Jira issues at once.
+
+        Args:
+            issue_id_or_keys (list[str]): The ids or keys of the Jira issues to retrieve.
+
+        Returns:
+            list[dict[str, Any]]: The retrieved Jira issues in the requested order. Issues that do not exist or are not visible are omitted. Each issue has the same structure as the result of get_issue_jira.
+        """
+        return await get_issues(issue_id_or_keys)
+
+    @mcp.tool()
+    def search_jira(jql: str, start_at: int, max_results: int) -> dict[str, Any]:
+        """
+        When to use:
+            Use this function to search for Jira issues using JQL (Jira Query Language).
+
+        Args:
+            jql (str): The JQL query string to use for searching issues.
+            start_at (int): The index of the first issue to return.
+            max_results (int): The maximum number of issues to return.
+
+        Returns:
+            dict[str, Any]: Information about the searched Jira issues as a dictionary, including:
+                expand (str): Additional fields that can be requested.
+                issues (list): List of matching Jira issues. Each issue includes:
+                    expand (str): Additional fields that can be requested.
+                    fields (dict): Details of the issue, including:
+                        assignee (dict): The person to whom the issue is currently assigned.
+                        attachment (list): Files attached to the issue.
+                        comment (dict): Comments on the issue.
+                        components (list): Project components to which this issue relates.
+                        created (str): The time and date when this issue was created.
+                        description (str): A detailed description of the issue.
+                        issuetype (dict): The type of the issue.
+                        labels (list): Labels to which this issue relates.
+                        reporter (dict): The person who created the issue.
+                        status (dict): The current status of the issue in its workflow.
+                        summary (str): A brief one-line summary of the issue.
+                        updated (str): The time and date when this issue was last updated.
+                    id (str): The id of the issue.
+                    key (str): The key of the issue.
+                    self (str): The URL of the issue.
+                maxResults (int): The maximum number of issues returned.
+                startAt (int): The index of the first returned issue.
+                total (int): The total number of results matching the JQL query.
+        """
+        url = "/rest/api/2/search"
+        params = {
+            "fields": FIELDS,
+            "jql": jql,
+            "maxResults": max_results,
+            "startAt": start_at,
+        }
+        response = get_session().get(url, params=params)
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    @mcp.tool()
+    def update_issue_jira(issue_id_or_key: str, fields: dict[str, Any]) -> int:
+        """
+        When to use:
+            Use this function to update the fields of a Jira issue.
+
+        Args:
+            issue_id_or_key (str): The id or key of the Jira issue to update.
+            fields (dict[str, Any]): A dictionary containing the fields to update in the issue.
+
+        Returns:
+            int: The HTTP status code of the update operation.
+        """
+        url = f"/rest/api/2/issue/{issue_id_or_key}"
+        payload = {"fields": fields}
+        response = get_session().put(url, json=payload)
+        response.raise_for_status()
+        evict_issue(issue_id_or_key)
+        return response.status_code
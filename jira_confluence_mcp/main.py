@@ -1,11 +1,15 @@
 from mcp.server import fastmcp
 
-import confluence
-import jira
+from jira_confluence_mcp import confluence, jira
 
 mcp = fastmcp.FastMCP("jira-confluence-mcp")
 confluence.add_tools(mcp)
 jira.add_tools(mcp)
 
-if __name__ == "__main__":
+
+def main():
     mcp.run()
+
+
+if __name__ == "__main__":
+    main()